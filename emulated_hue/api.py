@@ -1,4 +1,5 @@
 """Support for a Hue API to control Home Assistant."""
+import asyncio
 import copy
 import datetime
 import functools
@@ -30,6 +31,32 @@ LOGGER = logging.getLogger(__name__)
 STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "web_static")
 DESCRIPTION_FILE = os.path.join(STATIC_DIR, "description.xml")
 
+# HASS color modes used to determine the Hue light type
+COLOR_MODES_COLOR = frozenset(
+    {
+        const.HASS_COLOR_MODE_HS,
+        const.HASS_COLOR_MODE_XY,
+        const.HASS_COLOR_MODE_RGB,
+        const.HASS_COLOR_MODE_RGBW,
+        const.HASS_COLOR_MODE_RGBWW,
+    }
+)
+COLOR_MODES_WHITE = frozenset(
+    {
+        const.HASS_COLOR_MODE_COLOR_TEMP,
+        const.HASS_COLOR_MODE_RGBW,
+        const.HASS_COLOR_MODE_RGBWW,
+        const.HASS_COLOR_MODE_WHITE,
+    }
+)
+COLOR_MODES_COLOR_ONLY = frozenset(
+    {
+        const.HASS_COLOR_MODE_HS,
+        const.HASS_COLOR_MODE_XY,
+        const.HASS_COLOR_MODE_RGB,
+    }
+)
+
 
 class ClassRouteTableDef(web.RouteTableDef):
     """Allow decorators for route registering within class methods."""
@@ -297,15 +324,33 @@ class HueApi:
             scene = await self.config.async_get_storage_value(
                 "scenes", request_data["scene"], default={}
             )
+            # resolve all lights before sending any command so a stale
+            # scene entry only skips that light instead of the whole scene
+            light_actions = []
             for light_id, light_state in scene["lightstates"].items():
-                entity = await self.config.async_entity_by_light_id(light_id)
-                await self.__async_light_action(entity, light_state)
+                try:
+                    entity = await self.config.async_entity_by_light_id(light_id)
+                except Exception as exc:  # pylint: disable=broad-except
+                    LOGGER.warning("Skipping light %s in scene: %s", light_id, exc)
+                    continue
+                light_actions.append((entity, light_state))
+            await asyncio.gather(
+                *(
+                    self.__async_light_action(entity, light_state)
+                    for entity, light_state in light_actions
+                )
+            )
         else:
-            # forward request to all group lights
-            # may need refactor to make __async_get_group_lights not an
-            # async generator to instead return a dict
-            async for entity in self.__async_get_group_lights(group_id):
-                await self.__async_light_action(entity, request_data)
+            # forward request to all group lights at once
+            entities = [
+                entity async for entity in self.__async_get_group_lights(group_id)
+            ]
+            await asyncio.gather(
+                *(
+                    self.__async_light_action(entity, request_data)
+                    for entity in entities
+                )
+            )
         if group_conf and "stream" in group_conf:
             # Request streaming stop
             # Duplicate code here. Method instead?
@@ -618,10 +663,11 @@ class HueApi:
         power_on = request_data.get(const.HASS_STATE_ON, True)
 
         # throttle command to light
-        data_with_power = request_data.copy()
-        data_with_power[const.HASS_STATE_ON] = power_on
-        if not self.__update_allowed(entity, data_with_power, throttle_ms):
-            return
+        if throttle_ms:
+            data_with_power = request_data.copy()
+            data_with_power[const.HASS_STATE_ON] = power_on
+            if not self.__update_allowed(entity, data_with_power, throttle_ms):
+                return
 
         service = (
             const.HASS_SERVICE_TURN_ON if power_on else const.HASS_SERVICE_TURN_OFF
@@ -659,8 +705,17 @@ class HueApi:
                 elif request_data[const.HUE_ATTR_ALERT] == "lselect":
                     data[const.HASS_ATTR_FLASH] = "long"
                 # HASS now requires a color target to be sent when flashing
-                # Use white color to indicate the light
-                data[const.HASS_ATTR_HS_COLOR] = (0, 0)
+                # Use white color to indicate the light, unless the request
+                # already sets a color target
+                if not any(
+                    attr in data
+                    for attr in (
+                        const.HASS_ATTR_HS_COLOR,
+                        const.HASS_ATTR_XY_COLOR,
+                        const.HASS_ATTR_COLOR_TEMP,
+                    )
+                ):
+                    data[const.HASS_ATTR_HS_COLOR] = (0, 0)
 
         if const.HUE_ATTR_TRANSITION in request_data:
             # Duration of the transition from the light to the new state
@@ -683,21 +738,19 @@ class HueApi:
     ) -> bool:
         """Minimalistic form of throttling, only allow updates to a light within a timespan."""
 
-        if not throttle_ms:
-            return True
-
-        prev_data = self._prev_data.get(entity["entity_id"], {})
+        entity_id = entity["entity_id"]
+        prev_data = self._prev_data.get(entity_id)
 
         # pass initial request to light
         if not prev_data:
-            self._prev_data[entity["entity_id"]] = light_data.copy()
+            self._prev_data[entity_id] = light_data.copy()
             return True
 
         # force to update if power state changed
         if (entity["state"] == const.HASS_STATE_ON) != light_data.get(
             const.HASS_STATE_ON, True
         ):
-            self._prev_data[entity["entity_id"]].update(light_data)
+            prev_data.update(light_data)
             return True
 
         # check if data changed
@@ -705,19 +758,36 @@ class HueApi:
         if prev_data == light_data:
             return False
 
-        self._prev_data[entity["entity_id"]].update(light_data)
+        prev_data.update(light_data)
 
         # check throttle timestamp so light commands are only sent once every X milliseconds
         # this is to not overload a light implementation in Home Assistant
-        prev_timestamp = self._timestamps.get(entity["entity_id"], 0)
-        cur_timestamp = int(time.time() * 1000)
-        time_diff = abs(cur_timestamp - prev_timestamp)
-        if time_diff >= throttle_ms:
+        prev_timestamp = self._timestamps.get(entity_id)
+        cur_timestamp = time.monotonic()
+        if (
+            prev_timestamp is None
+            or cur_timestamp - prev_timestamp >= throttle_ms / 1000
+        ):
             # change allowed only if within throttle limit
-            self._timestamps[entity["entity_id"]] = cur_timestamp
+            self._timestamps[entity_id] = cur_timestamp
             return True
         return False
 
+    @staticmethod
+    def __get_latest_color(entity_attr: dict, last_light_state: dict) -> tuple:
+        """Return the xy, hue and sat values of an entity, falling back to last known state."""
+        latest_xy = entity_attr.get(
+            const.HASS_ATTR_XY_COLOR, last_light_state.get(const.HUE_ATTR_XY, [0, 0])
+        )
+        latest_hue, latest_sat = entity_attr.get(const.HASS_ATTR_HS_COLOR) or (0, 0)
+        latest_hue = (
+            latest_hue if latest_hue else last_light_state.get(const.HUE_ATTR_HUE, 0)
+        )
+        latest_sat = (
+            latest_sat if latest_sat else last_light_state.get(const.HUE_ATTR_SAT, 0)
+        )
+        return latest_xy, latest_hue, latest_sat
+
     async def __async_entity_to_hue(
         self,
         entity: dict,
@@ -726,8 +796,8 @@ class HueApi:
     ) -> dict:
         """Convert an entity to its Hue bridge JSON representation."""
         entity_attr = entity_attributes_to_int(entity[const.HASS_ATTR])
-        entity_color_modes = entity[const.HASS_ATTR].get(
-            const.HASS_ATTR_SUPPORTED_COLOR_MODES, []
+        entity_color_modes = frozenset(
+            entity_attr.get(const.HASS_ATTR_SUPPORTED_COLOR_MODES) or ()
         )
         if not light_id:
             light_id = await self.config.async_entity_id_to_light_id(
@@ -742,8 +812,7 @@ class HueApi:
                 "reachable": entity["state"] != const.HASS_STATE_UNAVAILABLE,
                 "mode": "homeautomation",
             },
-            "name": light_config["name"]
-            or entity[const.HASS_ATTR].get("friendly_name", ""),
+            "name": light_config["name"] or entity_attr.get("friendly_name", ""),
             "uniqueid": light_config["uniqueid"],
             "swupdate": {
                 "state": "noupdates",
@@ -764,41 +833,11 @@ class HueApi:
             const.HASS_ATTR_BRIGHTNESS,
             last_light_state.get(const.HUE_ATTR_BRI, 0),
         )
-        latest_xy = entity_attr.get(
-            const.HASS_ATTR_XY_COLOR, last_light_state.get(const.HUE_ATTR_XY, [0, 0])
-        )
-        latest_hue = entity_attr.get(const.HASS_ATTR_HS_COLOR, [0, 0])[0]
-        latest_hue = (
-            latest_hue if latest_hue else last_light_state.get(const.HUE_ATTR_HUE, 0)
-        )
-        latest_sat = entity_attr.get(const.HASS_ATTR_HS_COLOR, [0, 0])[1]
-        latest_sat = (
-            latest_sat if latest_sat else last_light_state.get(const.HUE_ATTR_SAT, 0)
-        )
-        latest_ct = entity_attr.get(
-            const.HASS_ATTR_COLOR_TEMP, last_light_state.get(const.HUE_ATTR_CT, 0)
-        )
 
         # Determine correct Hue type from HA supported features
-        if any(
-            color_mode
-            in [
-                const.HASS_COLOR_MODE_HS,
-                const.HASS_COLOR_MODE_XY,
-                const.HASS_COLOR_MODE_RGB,
-                const.HASS_COLOR_MODE_RGBW,
-                const.HASS_COLOR_MODE_RGBWW,
-            ]
-            for color_mode in entity_color_modes
-        ) and any(
-            color_mode
-            in [
-                const.HASS_COLOR_MODE_COLOR_TEMP,
-                const.HASS_COLOR_MODE_RGBW,
-                const.HASS_COLOR_MODE_RGBWW,
-                const.HASS_COLOR_MODE_WHITE,
-            ]
-            for color_mode in entity_color_modes
+        # color and color temperature values are only resolved for types that report them
+        if entity_color_modes & COLOR_MODES_COLOR and (
+            entity_color_modes & COLOR_MODES_WHITE
         ):
             # Extended Color light (Zigbee Device ID: 0x0210)
             # Same as Color light, but which supports additional setting of color temperature
@@ -808,6 +847,12 @@ class HueApi:
             retval["capabilities"]["control"]["ct"]["min"] = ct_min
             ct_max = entity_attr.get("max_mireds", 500)
             retval["capabilities"]["control"]["ct"]["max"] = ct_max
+            latest_xy, latest_hue, latest_sat = self.__get_latest_color(
+                entity_attr, last_light_state
+            )
+            latest_ct = entity_attr.get(
+                const.HASS_ATTR_COLOR_TEMP, last_light_state.get(const.HUE_ATTR_CT, 0)
+            )
             retval["state"].update(
                 {
                     const.HUE_ATTR_BRI: latest_brightness,
@@ -825,18 +870,13 @@ class HueApi:
                     const.HUE_ATTR_ALERT: "none",
                 }
             )
-        elif any(
-            color_mode
-            in [
-                const.HASS_COLOR_MODE_HS,
-                const.HASS_COLOR_MODE_XY,
-                const.HASS_COLOR_MODE_RGB,
-            ]
-            for color_mode in entity_color_modes
-        ):
+        elif entity_color_modes & COLOR_MODES_COLOR_ONLY:
             # Color light (Zigbee Device ID: 0x0200)
             # Supports on/off, dimming and color control (hue/saturation, enhanced hue, color loop and XY)
             retval.update(self.hue.config.definitions["lights"]["Color light"])
+            latest_xy, latest_hue, latest_sat = self.__get_latest_color(
+                entity_attr, last_light_state
+            )
             retval["state"].update(
                 {
                     const.HUE_ATTR_BRI: latest_brightness,
@@ -860,6 +900,9 @@ class HueApi:
             retval["capabilities"]["control"]["ct"]["min"] = ct_min
             ct_max = entity_attr.get("max_mireds", 500)
             retval["capabilities"]["control"]["ct"]["max"] = ct_max
+            latest_ct = entity_attr.get(
+                const.HASS_ATTR_COLOR_TEMP, last_light_state.get(const.HUE_ATTR_CT, 0)
+            )
             retval["state"].update(
                 {
                     const.HUE_ATTR_BRI: latest_brightness,
@@ -908,9 +951,10 @@ class HueApi:
                                 retval["uniqueid"] = identifier
                                 break
 
-        # Write new state to light config
-        light_config["state"] = retval.get("state")
-        await self.config.async_set_storage_value("lights", light_id, light_config)
+        # Write new state to light config, only when it changed
+        if light_config.get("state") != retval["state"]:
+            light_config["state"] = retval["state"]
+            await self.config.async_set_storage_value("lights", light_id, light_config)
 
         return retval
 
@@ -983,7 +1027,6 @@ class HueApi:
             lights_on = 0
             # get all entities for this device
             async for entity in self.__async_get_group_lights(group_id):
-                entity = self.hue.hass.get_state(entity["entity_id"], attribute=None)
                 light_id = await self.config.async_entity_id_to_light_id(
                     entity["entity_id"]
                 )
@@ -1059,7 +1102,12 @@ class HueApi:
         # Local group
         else:
             for light_id in group_conf["lights"]:
-                entity = await self.config.async_entity_by_light_id(light_id)
+                try:
+                    entity = await self.config.async_entity_by_light_id(light_id)
+                except Exception as exc:  # pylint: disable=broad-except
+                    # skip lights whose entity no longer exists in HASS
+                    LOGGER.warning("Skipping light %s in group: %s", light_id, exc)
+                    continue
                 yield entity
 
     async def __async_whitelist_to_bridge_config(self) -> dict:
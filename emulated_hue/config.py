@@ -4,6 +4,7 @@ import datetime
 import hashlib
 import logging
 import os
+import time
 from typing import TYPE_CHECKING, Any, Optional
 
 from getmac import get_mac_address
@@ -84,13 +85,20 @@ class Config:
         self._saver_task = None  # type: asyncio.Task | None
 
     async def _background_saver(self) -> None:
-        last_save = 0
+        last_save = None
         while not self._interrupted:
-            now = datetime.datetime.now().timestamp()
-            if self._need_save and now - last_save > CONFIG_WRITE_INTERVAL_SECONDS:
+            now = time.monotonic()
+            if self._need_save and (
+                last_save is None or now - last_save > CONFIG_WRITE_INTERVAL_SECONDS
+            ):
+                self._need_save = False
                 await async_save_json(self.get_path(CONFIG_FILE), self._config)
                 last_save = now
             await asyncio.sleep(1)
+        # flush any pending changes on shutdown
+        if self._need_save:
+            self._need_save = False
+            await async_save_json(self.get_path(CONFIG_FILE), self._config)
 
     async def async_start(self, loop: asyncio.AbstractEventLoop) -> None:
         """Start background saving task."""
@@ -305,7 +313,7 @@ class Config:
             self._config[key].pop(subkey, None)
         else:
             self._config.pop(key)
-        await async_save_json(self.get_path(CONFIG_FILE), self._config)
+        self._need_save = True
 
     async def async_get_users(self) -> dict:
         """Get all registered users as dict."""
@@ -117,23 +117,18 @@ class EntertainmentAPI:
 
         entity_id = light_conf["entity_id"]
         svc_data = {"entity_id": entity_id}
+        # channels are 16 bits big endian, HASS rgb and brightness take
+        # 8 bits so the high byte is the scaled value
         if color_space == COLOR_TYPE_RGB:
-            svc_data[HASS_ATTR_RGB_COLOR] = [
-                int((light_data[3] * 256 + light_data[4]) / 256),
-                int((light_data[5] * 256 + light_data[6]) / 256),
-                int((light_data[7] * 256 + light_data[8]) / 256),
-            ]
-            svc_data[HASS_ATTR_BRIGHTNESS] = sum(svc_data[HASS_ATTR_RGB_COLOR]) / len(
-                svc_data[HASS_ATTR_RGB_COLOR]
-            )
+            rgb_color = [light_data[3], light_data[5], light_data[7]]
+            svc_data[HASS_ATTR_RGB_COLOR] = rgb_color
+            svc_data[HASS_ATTR_BRIGHTNESS] = sum(rgb_color) / 3
         else:
             svc_data[HASS_ATTR_XY_COLOR] = [
-                float((light_data[3] * 256 + light_data[4]) / 65535),
-                float((light_data[5] * 256 + light_data[6]) / 65535),
+                (light_data[3] * 256 + light_data[4]) / 65535,
+                (light_data[5] * 256 + light_data[6]) / 65535,
             ]
-            svc_data[HASS_ATTR_BRIGHTNESS] = int(
-                (light_data[7] * 256 + light_data[8]) / 256
-            )
+            svc_data[HASS_ATTR_BRIGHTNESS] = light_data[7]
 
         # update allowed within throttling, push to light
         if throttle_ms:
@@ -158,9 +153,12 @@ class EntertainmentAPI:
         # this is to not overload a light implementation in Home Assistant
         if not throttle_ms:
             return True
-        prev_timestamp = self._timestamps.get(light_id, 0)
-        cur_timestamp = int(time.time() * 1000)
-        if (cur_timestamp - prev_timestamp) >= throttle_ms:
+        prev_timestamp = self._timestamps.get(light_id)
+        cur_timestamp = time.monotonic()
+        if (
+            prev_timestamp is None
+            or cur_timestamp - prev_timestamp >= throttle_ms / 1000
+        ):
             # change allowed only if within throttle limit
             self._timestamps[light_id] = cur_timestamp
             return True